@@ -2,7 +2,9 @@ import streamlit as st
 import subprocess
 import pandas as pd
 import json
+import orjson
 import os
+import pyarrow as pa
 import signal
 import threading
 import time
@@ -78,32 +80,111 @@ with st.sidebar:
 # --- State Management ---
 if "recon_data" not in st.session_state:
     st.session_state.recon_data = []
+if "recon_version" not in st.session_state:
+    st.session_state.recon_version = 0
+if "all_techs" not in st.session_state:
+    # Maintained incrementally at ingest — O(1) per record instead of an
+    # O(N) rescan of every tech list on every Streamlit rerun
+    st.session_state.all_techs = set()
 if "vulnerabilities" not in st.session_state:
     st.session_state.vulnerabilities = []
 
+
+@st.cache_resource(show_spinner=False)
+def report_template():
+    # Compiled once per process — template tokenize/parse/codegen is the
+    # expensive part of report generation, not render().
+    env = Environment(loader=FileSystemLoader("app/templates"), auto_reload=False, cache_size=400)
+    return env.get_template("report_template.md.j2")
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def build_recon_df(version, _rows):
+    # _rows is excluded from the cache key (leading underscore); `version`
+    # is bumped on every append, so reruns with unchanged recon data get
+    # the cached frame instead of rebuilding O(N) from the list.
+    df = pd.DataFrame(_rows)
+    if 'tech_stack' in df.columns:
+        # Flat lowercased companion column (SoA): one sentinel-joined
+        # string per row, so substring filters scan a single flat column
+        # and never re-lowercase the lists per query.
+        df['tech_stack_joined'] = [
+            '\x1f' + '\x1f'.join(t.lower() for t in xs) + '\x1f' if xs else ''
+            for xs in df['tech_stack']
+        ]
+        # Arrow list<string> storage: contiguous instead of nested Python
+        # lists, so triage filters run on Arrow compute kernels.
+        try:
+            df['tech_stack'] = df['tech_stack'].astype(triage_logic.TECH_STACK_DTYPE)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            pass
+    return df
+
 # --- Helper Functions for Asset Tracking ---
-HISTORY_FILE = "app/recon_history.json"
+# Line-delimited, append-only: saving costs O(new subdomains) instead of
+# re-serializing the whole history on every run.
+HISTORY_FILE = "app/recon_history.ndjson"
+LEGACY_HISTORY_FILE = "app/recon_history.json"
 
+@st.cache_resource(show_spinner=False)
 def load_history():
-    if os.path.exists(HISTORY_FILE):
+    # One shared in-memory set per process; save_history mutates it in
+    # place so reruns never go back to disk. EAFP opens: one syscall per
+    # file instead of a stat + open pair.
+    subs = set()
+    try:
+        with open(HISTORY_FILE, "r") as f:
+            subs.update(f.read().splitlines())
+        subs.discard('')
+    except FileNotFoundError:
+        # Migrate from the old full-rewrite JSON format: write the legacy
+        # entries into the NDJSON too, otherwise the first append-only
+        # save creates it with just the new subdomains and every later
+        # process forgets the legacy history.
         try:
-            with open(HISTORY_FILE, "r") as f:
-                return set(json.load(f))
-        except:
-            return set()
-    return set()
+            with open(LEGACY_HISTORY_FILE, "r") as f:
+                subs.update(json.load(f))
+        except (FileNotFoundError, ValueError, OSError):
+            pass
+        if subs:
+            with open(HISTORY_FILE, "a") as f:
+                f.write('\n'.join(subs) + '\n')
+    return subs
 
 def save_history(subdomains):
-    # Merge with existing
     existing = load_history()
-    existing.update(subdomains)
-    with open(HISTORY_FILE, "w") as f:
-        json.dump(list(existing), f)
+    new = set(subdomains) - existing
+    if not new:
+        return
+    with open(HISTORY_FILE, "a") as f:
+        f.write('\n'.join(new) + '\n')
+    existing.update(new)
 
 # --- Workers ---
 def read_output(process, data_queue):
-    for line in iter(process.stdout.readline, b''):
-        data_queue.put(line.decode('utf-8'))
+    # Read 64 KiB chunks straight from the fd and enqueue whole batches of
+    # decoded lines: one syscall and one queue-lock acquire per chunk
+    # instead of per line, which matters when the Go engine emits
+    # thousands of records per second.
+    fd = process.stdout.fileno()
+    buf = b''
+    while True:
+        try:
+            chunk = os.read(fd, 65536)
+        except OSError:
+            break
+        if not chunk:
+            break
+        buf += chunk
+        if b'\n' not in chunk:
+            continue
+        *lines, buf = buf.split(b'\n')
+        # Lines stay as bytes: orjson parses them directly, so no decode pass
+        batch = [l for l in lines if l]
+        if batch:
+            data_queue.put(batch)
+    if buf:
+        data_queue.put([buf])
     process.stdout.close()
 
 # --- Main Logic ---
@@ -113,14 +194,40 @@ tab1, tab2, tab3 = st.tabs(["🔴 Live Recon", "🧪 Vuln Triage", "📄 Reports
 with tab1:
     if start_btn:
         st.session_state.recon_data = [] # Reset on new run
+        st.session_state.recon_version += 1
+        st.session_state.all_techs = set()
         st.session_state.vulnerabilities = []
         
         status_text = st.empty()
+        metrics_frame = st.empty()
         table_placeholder = st.empty()
-        metric_col1, metric_col2, metric_col3 = st.columns(3)
-        
+
+        def render_metrics(total, ok):
+            # All metrics repaint as one element update per batch instead
+            # of one websocket message per metric
+            with metrics_frame.container():
+                c1, c2, c3 = st.columns(3)
+                c1.metric("Subdomains", total)
+                c2.metric("Live (200 OK)", ok)
+
         status_text.info(f"🚀 Launching Recon Engine against **{target_domain}**...")
-        
+
+        # Column-oriented (SoA) buffers for rows not yet pushed to the
+        # browser: appending to per-column lists is O(batch) per update.
+        LIVE_COLS = ['timestamp', 'subdomain', 'status_code', 'title', 'tech_stack', 'asn', 'org']
+        pending_cols = {c: [] for c in LIVE_COLS}
+        ok_count = 0
+        total_count = 0
+
+        # Render the table once, then stream only deltas with add_rows so
+        # each update ships O(batch) rows over the websocket, not the
+        # whole accumulated table.
+        live_table = table_placeholder.dataframe(
+            pd.DataFrame({c: [] for c in LIVE_COLS}),
+            use_container_width=True,
+            height=400
+        )
+
         try:
             # Check binaries first (Go engine does this too, but good UX to fail fast)
             # Actually, Go engine handles it better with JSON error, let's trust Go.
@@ -136,52 +243,75 @@ with tab1:
             process = subprocess.Popen(
                 cmd,
                 stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                bufsize=1,
-                universal_newlines=False
+                stderr=subprocess.PIPE
             )
-            
+
             q = Queue()
             t = threading.Thread(target=read_output, args=(process, q))
             t.daemon = True
             t.start()
-            
+
+            RENDER_INTERVAL = 0.25  # seconds between UI repaints
+            last_render = 0.0
+            engine_error = False
+
             while process.poll() is None or not q.empty():
+                # Block until at least one line arrives (or timeout so we can
+                # re-check the process), then drain everything already queued
+                # in one pass instead of waking up at a fixed 10 Hz.
+                new_rows = []
                 try:
-                    line = q.get_nowait()
-                    if line:
-                        try:
-                            data = json.loads(line)
-                            # Handle Error Message from Go
-                            if 'error' in data:
-                                status_text.error(f"❌ {data['error']}: {data.get('message', '')}")
-                                break
-                                
-                            st.session_state.recon_data.append(data)
-                        except json.JSONDecodeError:
-                            pass 
+                    batch = q.get(timeout=RENDER_INTERVAL)
+                    while True:
+                        for line in batch:
+                            try:
+                                data = orjson.loads(line)
+                                # Handle Error Message from Go
+                                if 'error' in data:
+                                    status_text.error(f"❌ {data['error']}: {data.get('message', '')}")
+                                    engine_error = True
+                                    break
+                                # Schema contract: tech_stack is always a
+                                # list, enforced once here so downstream
+                                # code never needs per-row type checks.
+                                data['tech_stack'] = data.get('tech_stack') or []
+                                new_rows.append(data)
+                            except orjson.JSONDecodeError:
+                                pass
+                        if engine_error:
+                            break
+                        batch = q.get_nowait()
                 except Empty:
-                    time.sleep(0.1)
-                
-                if st.session_state.recon_data:
-                    df = pd.DataFrame(st.session_state.recon_data)
-                    metric_col1.metric("Subdomains", len(df))
-                    metric_col2.metric("Live (200 OK)", len(df[df['status_code'] == 200]))
-                    
-                    # Display Data
-                    # Highlight New Assets
-                    # ... (marked logic handled above)
-                    
-                    cols_to_show = ['timestamp', 'subdomain', 'status_code', 'title', 'tech_stack', 'asn', 'org']
-                    # Ensure columns exist
-                    disp_cols = [c for c in cols_to_show if c in df.columns]
-                    
-                    table_placeholder.dataframe(
-                        df[disp_cols], 
-                        use_container_width=True,
-                        height=400
-                    )
+                    pass
+
+                if engine_error:
+                    break
+
+                if new_rows:
+                    st.session_state.recon_data.extend(new_rows)
+                    st.session_state.recon_version += 1
+                    total_count += len(new_rows)
+                    for rec in new_rows:
+                        if rec.get('status_code') == 200:
+                            ok_count += 1
+                        st.session_state.all_techs.update(rec.get('tech_stack') or [])
+                        for c in LIVE_COLS:
+                            pending_cols[c].append(rec.get(c))
+
+                # Throttle rendering: one delta push per interval, not per line
+                now = time.monotonic()
+                if pending_cols['subdomain'] and (now - last_render) >= RENDER_INTERVAL:
+                    last_render = now
+                    render_metrics(total_count, ok_count)
+                    live_table.add_rows(pd.DataFrame(pending_cols))
+                    pending_cols = {c: [] for c in LIVE_COLS}
             
+            # Final flush so rows arriving inside the last throttle window show up
+            if pending_cols['subdomain']:
+                live_table.add_rows(pd.DataFrame(pending_cols))
+            if total_count:
+                render_metrics(total_count, ok_count)
+
             if process.returncode == 0:
                 status_text.success("✅ Recon Completed!")
                 
@@ -196,6 +326,7 @@ with tab1:
                 # Update Dataframe to indicate NEW
                 for item in st.session_state.recon_data:
                     item['is_new'] = item['subdomain'] in new_subs
+                st.session_state.recon_version += 1
                 
                 # Save to history
                 save_history(current_subs)
@@ -209,8 +340,8 @@ with tab1:
             
     else:
         if st.session_state.recon_data:
-            df = pd.DataFrame(st.session_state.recon_data)
-            
+            df = build_recon_df(st.session_state.recon_version, st.session_state.recon_data)
+
             # Add 'is_new' if not present (from history check above)
             if 'is_new' not in df.columns:
                  # Attempt load if recon was done previously but session state lost 'is_new' logic?
@@ -218,7 +349,7 @@ with tab1:
                  df['is_new'] = False
             
             st.dataframe(
-                df, 
+                df.drop(columns=['tech_stack_joined'], errors='ignore'),
                 column_config={
                     "is_new": st.column_config.CheckboxColumn("New Asset?", disabled=True)
                 },
@@ -234,84 +365,71 @@ with tab2:
     if not st.session_state.recon_data:
         st.warning("No recon data available. Run 'Live Recon' first.")
     else:
-        df = pd.DataFrame(st.session_state.recon_data)
-        
+        df = build_recon_df(st.session_state.recon_version, st.session_state.recon_data)
+
         # 1. Tech Stack Filter
-        all_techs = set()
-        for stack in df['tech_stack']:
-            if isinstance(stack, list):
-                for t in stack:
-                    all_techs.add(t)
-        
-        selected_tech = st.selectbox("Filter by Technology", ["All"] + list(all_techs))
+        selected_tech = st.selectbox("Filter by Technology", ["All"] + sorted(st.session_state.all_techs))
         
         if selected_tech != "All":
-            filtered_df = triage_logic.filter_by_tech(df, selected_tech)
+            # Selectbox values come verbatim from the tech universe, so
+            # the exact-match categorical filter applies
+            filtered_df = triage_logic.filter_by_tech_exact(df, selected_tech, version=st.session_state.recon_version)
         else:
-            filtered_df = df.copy()
+            # No copy: the editable columns live in the triage overlay
+            # below, so the full recon frame is never duplicated.
+            filtered_df = df
 
         # --- Schema Validation Test ---
         with st.expander("🛠️ Schema Debug Info"):
-            if not filtered_df.empty:
-                sample_tech = filtered_df.iloc[0]['tech_stack']
-                st.write(f"Sample 'tech_stack' value: `{sample_tech}`")
-                st.write(f"Type: `{type(sample_tech)}`")
-                if isinstance(sample_tech, list):
-                    st.success("✅ Schema Integrity: 'tech_stack' is a list")
+            if not filtered_df.empty and 'tech_stack' in filtered_df.columns:
+                # The list contract is enforced at ingest, so one
+                # column-level dtype check replaces per-row isinstance tests
+                dtype = filtered_df['tech_stack'].dtype
+                st.write(f"'tech_stack' dtype: `{dtype}`")
+                if dtype == triage_logic.TECH_STACK_DTYPE:
+                    st.success("✅ Schema Integrity: 'tech_stack' is list<string>")
                 else:
-                    st.error(f"❌ Schema Validation Failed: Expected list, got {type(sample_tech)}")
+                    st.error(f"❌ Schema Validation Failed: Expected list<string>, got {dtype}")
         
         st.subheader(f"Targets ({len(filtered_df)})")
-        
-        # Add Select Column
-        if 'Select' not in filtered_df.columns:
-            filtered_df.insert(0, "Select", False)
-        
-        # Add False Positive Column
-        if 'False Positive' not in filtered_df.columns:
-            filtered_df['False Positive'] = False
+
+        # Editable columns live in a narrow overlay indexed by subdomain,
+        # so marking a target doesn't require copying the wide recon frame.
+        if "triage_overlay" not in st.session_state:
+            st.session_state.triage_overlay = pd.DataFrame(
+                columns=["Select", "False Positive"], dtype=bool
+            )
+        overlay = st.session_state.triage_overlay
+        missing = filtered_df['subdomain'][~filtered_df['subdomain'].isin(overlay.index)]
+        if len(missing):
+            overlay = pd.concat([
+                overlay,
+                pd.DataFrame(False, index=missing, columns=overlay.columns)
+            ])
+            st.session_state.triage_overlay = overlay
+
+        display_df = filtered_df.join(overlay, on='subdomain')
 
         # High Value: File Upload, GraphQL, Auth
-        # Also check for outdated versions (simple keyword check in versions map)
         sensitive_keywords = ['upload', 'graphql', 'auth', 'login', 'admin', 'api']
-        
-        def calculate_risk(row):
-            tech_list = row.get('tech_stack', [])
-            versions = row.get('versions', {})
-            
-            # Check Tech Stack
-            if isinstance(tech_list, list):
-                for t in tech_list:
-                    for k in sensitive_keywords:
-                        if k.lower() in t.lower():
-                            return True
-            
-            # Check Versions for indication of old stuff (very basic heuristic)
-            if isinstance(versions, dict):
-                for tech, ver in versions.items():
-                    # Mock logic: if version starts with '4.' for WP... 
-                    # Real logic might be complex, here we rely on WhatWeb output string availability
-                    pass
-            
-            return False
 
-        filtered_df['High Value'] = filtered_df.apply(calculate_risk, axis=1)
+        display_df['High Value'] = triage_logic.flag_high_value(filtered_df, sensitive_keywords)
 
         # Use Data Editor for selection and False Positive marking
         # Include granular columns if available
-        
-        # Flatten versions for display? 
+
+        # Flatten versions for display?
         # Convert versions dict to string
-        if 'versions' in filtered_df.columns:
-            filtered_df['Software Versions'] = filtered_df['versions'].apply(lambda x: str(x) if x else "")
+        if 'versions' in display_df.columns:
+            display_df['Software Versions'] = display_df['versions'].apply(lambda x: str(x) if x else "")
 
         # Display columns
         disp_cols_triage = ["Select", "False Positive", "High Value", "subdomain", "Software Versions", "tech_stack", "asn", "org"]
         # Filter existing columns only
-        disp_cols_final = [c for c in disp_cols_triage if c in filtered_df.columns]
+        disp_cols_final = [c for c in disp_cols_triage if c in display_df.columns]
 
         edited_df = st.data_editor(
-            filtered_df[disp_cols_final],
+            display_df[disp_cols_final],
             key="triage_editor",
             column_config={
                 "Select": st.column_config.CheckboxColumn("Select", default=False),
@@ -325,10 +443,13 @@ with tab2:
             use_container_width=True
         )
         
-        # Persist FPs
+        # Write edits back into the overlay (changed rows only) and persist FPs
         if not edited_df.empty and 'False Positive' in edited_df.columns:
-             fps = edited_df[edited_df['False Positive'] == True]['subdomain'].tolist()
-             st.session_state.fp_hosts = set(fps)
+            edits = edited_df.set_index('subdomain')[["Select", "False Positive"]]
+            changed = edits[(edits != overlay.reindex(edits.index)).any(axis=1)]
+            if len(changed):
+                overlay.loc[changed.index, ["Select", "False Positive"]] = changed
+            st.session_state.fp_hosts = set(overlay.index[overlay['False Positive'] == True])
         
         # 2. Run Nuclei
         st.markdown("---")
@@ -339,43 +460,39 @@ with tab2:
             if selected_rows.empty:
                 st.warning("⚠️ Please select at least one target from the list above.")
             else:
-                with st.spinner(f"Running Nuclei on {len(selected_rows)} targets..."):
-                    targets = selected_rows['subdomain'].tolist()
-                    output = triage_logic.run_nuclei(targets)
-                
-                # Check for error string
-                if isinstance(output, str) and output.startswith("❌"):
-                    st.error(output)
-                else:
-                    st.success("Nuclei Scan Complete!")
-                    # Try to parse Nuclei JSON output
-                    # Nuclei JSON output is one JSON object per line
-                    try:
-                        raw_lines = output.strip().split('\n')
-                        for l in raw_lines:
-                            if not l: continue
-                            v = json.loads(l)
-                            # Minimal mapping to our schema
-                            tags = v.get('info', {}).get('tags', [])
-                            vuln_obj = {
-                                "template": v.get('info', {}).get('name', 'Unknown'),
-                                "template_id": v.get('template-id'),
-                                "severity": v.get('info', {}).get('severity', 'info'),
-                                "host": v.get('host'),
-                                "matched_at": v.get('matched-at', ''),
-                                "timestamp": v.get('timestamp'),
-                                "category": triage_logic.map_tags_to_category(tags),
-                                "remediation": v.get('info', {}).get('remediation', 'No specific remediation provided.')
-                            }
-                            st.session_state.vulnerabilities.append(vuln_obj)
-                            
-                        # Display raw output in expander
-                        with st.expander("Raw Nuclei Output"):
-                            st.text(output)
-                            
-                    except Exception as e:
-                        st.warning(f"Could not parse Nuclei output fully: {e}")
-                        st.text(output)
+                targets = selected_rows['subdomain'].tolist()
+                scan_status = st.empty()
+                vuln_table = st.empty()
+                scan_status.info(f"☢️ Running Nuclei on {len(targets)} targets...")
+
+                try:
+                    # Findings stream in one at a time — show them as they
+                    # arrive instead of waiting for the whole scan. Large
+                    # target lists are sharded across concurrent Nuclei
+                    # processes behind the merged stream.
+                    for v in triage_logic.run_nuclei_parallel(targets):
+                        # Minimal mapping to our schema
+                        tags = v.get('info', {}).get('tags', [])
+                        vuln_obj = {
+                            "template": v.get('info', {}).get('name', 'Unknown'),
+                            "template_id": v.get('template-id'),
+                            "severity": v.get('info', {}).get('severity', 'info'),
+                            "host": v.get('host'),
+                            "matched_at": v.get('matched-at', ''),
+                            "timestamp": v.get('timestamp'),
+                            "category": triage_logic.map_tags_to_category(tags),
+                            "remediation": v.get('info', {}).get('remediation', 'No specific remediation provided.')
+                        }
+                        st.session_state.vulnerabilities.append(vuln_obj)
+                        scan_status.info(f"☢️ Scanning... {len(st.session_state.vulnerabilities)} findings so far")
+                        vuln_table.dataframe(
+                            pd.DataFrame(st.session_state.vulnerabilities),
+                            use_container_width=True
+                        )
+
+                    scan_status.success(f"Nuclei Scan Complete! {len(st.session_state.vulnerabilities)} findings.")
+                except RuntimeError as e:
+                    scan_status.error(f"❌ {e}")
 
 # TAB 3: REPORT BOT
 with tab3:
@@ -386,16 +503,19 @@ with tab3:
         fp_hosts = st.session_state.get('fp_hosts', set())
         
         # Filter vulnerabilities where host is NOT in fp_hosts
-        valid_vulns = [v for v in st.session_state.vulnerabilities if v.get('host') not in fp_hosts]
+        vulns = st.session_state.vulnerabilities
+        if len(vulns) < 256:
+            # Small lists: the comprehension beats the DataFrame round-trip
+            valid_vulns = [v for v in vulns if v.get('host') not in fp_hosts]
+        else:
+            vulns_df = pd.DataFrame(vulns)
+            valid_vulns = vulns_df[~vulns_df['host'].isin(fp_hosts)].to_dict('records')
 
         if not valid_vulns:
             st.warning("No vulnerabilities found to report (or all marked as False Positive).")
         else:
             try:
-                env = Environment(loader=FileSystemLoader("app/templates"))
-                template = env.get_template("report_template.md.j2")
-                
-                report_md = template.render(
+                report_md = report_template().render(
                     target=target_domain,
                     date=datetime.now().strftime("%Y-%m-%d"),
                     vulns=valid_vulns
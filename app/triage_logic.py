@@ -1,70 +1,526 @@
 import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import re
 import subprocess
 import os
+import mmap
 import tempfile
-import json
-import streamlit as st
+import threading
+import orjson
+from queue import Queue
 
-def filter_by_tech(df, tech_name):
+__all__ = [
+    "TECH_STACK_DTYPE",
+    "filter_by_tech",
+    "filter_by_tech_exact",
+    "filter_by_techs",
+    "count_by_tech",
+    "flag_high_value",
+    "run_nuclei",
+    "run_nuclei_stream",
+    "run_nuclei_parallel",
+    "map_tags_to_category",
+]
+
+# Numba is optional: when present, large tech filters run a parallel
+# native kernel over a flat char buffer instead of pandas string ops.
+try:
+    from numba import njit, prange
+    _HAS_NUMBA = True
+except ImportError:
+    _HAS_NUMBA = False
+
+# Below this row count the buffer build + kernel dispatch outweighs the win
+_NUMBA_MIN_ROWS = 4096
+
+# Streamlit is only needed for its cache decorators, and importing it
+# drags in tornado/altair/pillow — hundreds of ms that non-Streamlit
+# consumers (tests, CLI use, shard worker processes) shouldn't pay.
+# Cached helpers are therefore wrapped lazily on first use.
+_ST_CACHED = {}
+
+def _st_cache_data(fn, **cache_kwargs):
+    cached = _ST_CACHED.get(fn)
+    if cached is None:
+        import streamlit as st  # cached in sys.modules after first call
+        cached = st.cache_data(**cache_kwargs)(fn)
+        _ST_CACHED[fn] = cached
+    return cached
+
+if _HAS_NUMBA:
+    @njit(parallel=True, cache=True)
+    def _numba_contains(buf, ends, needle):
+        # CSR-style layout: row i owns buf[ends[i-1]:ends[i]]. Plain
+        # byte-at-a-time substring scan, parallelized across rows.
+        n = ends.size
+        out = np.empty(n, np.bool_)
+        m = needle.size
+        for i in prange(n):
+            start = ends[i - 1] if i > 0 else 0
+            end = ends[i]
+            hit = False
+            if m > 0:
+                for j in range(start, end - m + 1):
+                    k = 0
+                    while k < m and buf[j + k] == needle[k]:
+                        k += 1
+                    if k == m:
+                        hit = True
+                        break
+            out[i] = hit
+        return out
+from functools import lru_cache
+from shutil import which
+
+@lru_cache(maxsize=1)
+def _nuclei_path():
+    # Pure-Python PATH scan, resolved once per process — no fork/exec of
+    # `which` before every scan. lru_cache (rather than a module-level
+    # constant) keeps dev hot-reloads from re-walking PATH per import.
+    return which("nuclei")
+
+TECH_STACK_DTYPE = pd.ArrowDtype(pa.list_(pa.string()))
+
+def _arrow_tech_mask(col, pattern, regex):
     """
-    Filters the dataframe for rows where 'tech_stack' contains the tech_name.
+    Row mask for an Arrow list<string> column: true where any list entry
+    matches the pattern (case insensitive). The whole pipeline —
+    list_flatten over the child array, substring match, list_parent_indices
+    to map hits back to rows — runs in Arrow C++ kernels with zero Python
+    calls per element.
     """
-    if df.empty or 'tech_stack' not in df.columns:
+    arr = col.array._pa_array.combine_chunks()
+    flat = pc.list_flatten(arr)
+    match = pc.match_substring_regex if regex else pc.match_substring
+    hit = pc.fill_null(match(flat, pattern, ignore_case=True), False)
+    parents = pc.list_parent_indices(arr).to_numpy(zero_copy_only=False)
+    mask = np.zeros(len(col), dtype=bool)
+    mask[parents[hit.to_numpy(zero_copy_only=False)]] = True
+    return mask
+
+def _build_tech_char_buffer(version, _df):
+    # Flat UTF-8 byte buffer + row-end offsets (CSR layout) over the
+    # precomputed joined column, built once per data version.
+    pieces = [s.encode('utf-8') for s in _df['tech_stack_joined'].tolist()]
+    buf = np.frombuffer(b''.join(pieces), dtype=np.uint8)
+    ends = np.cumsum(np.fromiter(map(len, pieces), dtype=np.int64, count=len(pieces)))
+    return buf, ends
+
+def _tech_char_buffer(version, _df):
+    return _st_cache_data(_build_tech_char_buffer, max_entries=4, show_spinner=False)(version, _df)
+
+def _tech_mask(df, pattern, regex=True, version=None):
+    # Arrow-backed columns take the compute-kernel path; otherwise prefer
+    # the precomputed flat lowercased column; plain object columns of
+    # Python lists fall back to explode + str.contains.
+    col = df['tech_stack']
+    if isinstance(col.dtype, pd.ArrowDtype):
+        return pd.Series(_arrow_tech_mask(col, pattern, regex), index=df.index)
+    if 'tech_stack_joined' in df.columns:
+        if (not regex and _HAS_NUMBA and version is not None
+                and len(df) >= _NUMBA_MIN_ROWS):
+            buf, ends = _tech_char_buffer(version, df)
+            needle = np.frombuffer(pattern.lower().encode('utf-8'), dtype=np.uint8)
+            return pd.Series(_numba_contains(buf, ends, needle), index=df.index)
+        # The column is lowercased at build time, so the needle must be
+        # case-folded too: lowered for plain substrings, (?i) for regexes
+        needle = '(?i)' + pattern if regex else pattern.lower()
+        return df['tech_stack_joined'].str.contains(needle, regex=regex, na=False)
+    # Last resort for raw object columns: a comprehension over .values
+    # skips the per-element wrapping and index bookkeeping of
+    # Series.apply; np.fromiter with count= preallocates the mask.
+    # tech_stack is coerced to a list at the ingest boundary, so no
+    # per-row type check — `or ()` only absorbs missing values.
+    vals = col.values
+    if regex:
+        pat = re.compile(pattern, re.IGNORECASE)
+        gen = (any(pat.search(t) for t in (x or ())) for x in vals)
+    else:
+        tl = pattern.lower()
+        gen = (any(tl in t.lower() for t in (x or ())) for x in vals)
+    mask = np.fromiter(gen, dtype=bool, count=len(vals))
+    return pd.Series(mask, index=df.index)
+
+def _build_tech_categorical(df):
+    # Exploded, lowercased, category-coded view of tech_stack: the tech
+    # universe is small, so matching compares small integer codes instead
+    # of scanning UTF-8 strings. Exploding over a dropped index yields
+    # row *positions*, so callers stay correct on frames whose index is
+    # not a default RangeIndex (e.g. already-filtered frames).
+    exploded = df['tech_stack'].reset_index(drop=True).explode().str.lower().astype('category')
+    return exploded.cat.categories, exploded.cat.codes.to_numpy(), exploded.index.to_numpy()
+
+def _versioned_tech_categorical(version, _df):
+    return _build_tech_categorical(_df)
+
+def _tech_categorical(version, _df):
+    return _st_cache_data(_versioned_tech_categorical, max_entries=4, show_spinner=False)(version, _df)
+
+_EMPTY_ROWS = np.empty(0, dtype=np.int32)
+
+def _build_tech_index(df):
+    # Inverted index over the tech universe: one O(N) pass at build time,
+    # then every exact-tech query is a dict lookup returning preallocated
+    # row positions.
+    index = {}
+    for i, xs in enumerate(df['tech_stack']):
+        # Dedupe per row: stacks can list the same tech in different
+        # casings (the engine's WhatWeb merge dedupes exact strings only),
+        # and a row must appear once per key regardless.
+        for t in {t.lower() for t in (xs or [])}:
+            index.setdefault(t, []).append(i)
+    return {k: np.asarray(v, dtype=np.int32) for k, v in index.items()}
+
+def _versioned_tech_index(version, _df):
+    return _build_tech_index(_df)
+
+def _tech_index(version, _df):
+    return _st_cache_data(_versioned_tech_index, max_entries=4, show_spinner=False)(version, _df)
+
+def filter_by_tech_exact(df, tech_name, version=None):
+    """
+    Filters the dataframe for rows whose tech_stack contains exactly
+    tech_name (case insensitive). Intended for needles taken verbatim
+    from the tech universe (e.g. the Triage selectbox): the match is one
+    category-code lookup plus an integer comparison over the codes array.
+    """
+    if not tech_name or df.empty or 'tech_stack' not in df.columns:
         return df
-    
-    # tech_stack is a list of strings.
-    # We apply a lambda to check if tech_name is in the list (case insensitive)
-    mask = df['tech_stack'].apply(
-        lambda x: any(tech_name.lower() in t.lower() for t in x) if isinstance(x, list) else False
-    )
+    if len(df) == 1:
+        tl = tech_name.lower()
+        techs = df['tech_stack'].iloc[0]
+        return df if any(t.lower() == tl for t in (techs or [])) else df.iloc[0:0]
+
+    if version is not None:
+        # Cached inverted index: O(1) per query instead of re-scanning
+        # the codes array
+        return df.iloc[_tech_index(version, df).get(tech_name.lower(), _EMPTY_ROWS)]
+
+    categories, codes, rows = _build_tech_categorical(df)
+    try:
+        code = categories.get_loc(tech_name.lower())
+    except KeyError:
+        return df.iloc[0:0]
+
+    mask = np.zeros(len(df), dtype=bool)
+    mask[rows[codes == code]] = True
     return df[mask]
 
+def _compute_tech_mask(version, tech_name, _df):
+    # Keyed on (recon version, needle); the frame itself is excluded from
+    # hashing (leading underscore). Caches the small boolean mask rather
+    # than the filtered frame so cache memory stays bounded.
+    return _tech_mask(_df, tech_name, regex=False, version=version).to_numpy()
+
+def _cached_tech_mask(version, tech_name, _df):
+    return _st_cache_data(_compute_tech_mask, max_entries=64, show_spinner=False)(version, tech_name, _df)
+
+def filter_by_tech(df, tech_name, version=None, *, return_mask=False):
+    """
+    Filters the dataframe for rows where 'tech_stack' contains the tech_name.
+
+    Pass the recon data version to memoize the mask across Streamlit
+    reruns — repeated reruns with an unchanged frame and needle then skip
+    the scan entirely. With return_mask=True the boolean row mask is
+    returned instead of a copied filtered frame, letting callers slice
+    just the columns they need (or only count).
+    """
+    # O(1) fast paths: empty needle or frame, and the single-row case
+    # where kernel dispatch overhead dwarfs the actual comparison
+    if not tech_name or df.empty or 'tech_stack' not in df.columns:
+        return np.ones(len(df), dtype=bool) if return_mask else df
+    if len(df) == 1:
+        tl = tech_name.lower()
+        techs = df['tech_stack'].iloc[0]
+        hit = any(tl in t.lower() for t in (techs or []))
+        if return_mask:
+            return np.array([hit])
+        return df if hit else df.iloc[0:0]
+
+    if version is not None:
+        mask = _cached_tech_mask(version, tech_name, df)
+    else:
+        # Single needle: plain substring kernel, no regex engine involved
+        mask = _tech_mask(df, tech_name, regex=False).to_numpy()
+    return mask if return_mask else df[mask]
+
+def filter_by_techs(df, tech_names, version=None):
+    """
+    Filters the dataframe for rows whose tech_stack contains any of the
+    given tech names (exact, case insensitive). All needles resolve in a
+    single pass over the inverted index — K dict lookups and one union of
+    precomputed row-id arrays, no repeated column scans.
+    """
+    tech_names = [t for t in tech_names if t]
+    if not tech_names or df.empty or 'tech_stack' not in df.columns:
+        return df
+
+    index = _tech_index(version, df) if version is not None else _build_tech_index(df)
+    rows = np.unique(np.concatenate(
+        [index.get(t.lower(), _EMPTY_ROWS) for t in tech_names]
+    ))
+    return df.iloc[rows]
+
+def count_by_tech(df, tech_name, version=None):
+    """
+    Number of rows whose tech_stack matches tech_name — computed from the
+    mask alone, no filtered frame materialized.
+    """
+    return int(filter_by_tech(df, tech_name, version, return_mask=True).sum())
+
+def flag_high_value(df, keywords):
+    """
+    Returns a boolean Series marking rows whose tech_stack mentions any of
+    the given sensitive keywords (case insensitive).
+    """
+    if df.empty or 'tech_stack' not in df.columns:
+        return pd.Series(False, index=df.index)
+
+    # One alternation pattern: a single pass replaces the per-row
+    # keywords x techs nested loop.
+    return _tech_mask(df, '|'.join(map(re.escape, keywords)))
+
+def _iter_newlines(mm):
+    """
+    Yields (start, end) offsets of each newline-terminated record in a
+    memory-mapped buffer.
+    """
+    pos = 0
+    size = len(mm)
+    while pos < size:
+        nl = mm.find(b'\n', pos)
+        if nl == -1:
+            nl = size
+        if nl > pos:
+            yield pos, nl
+        pos = nl + 1
+
+def _targets_blob(selected_subdomains):
+    # Newline-delimited target list, built once for the child's stdin —
+    # no temp file, no inode round-trip, no cleanup.
+    return ('\n'.join(selected_subdomains) + '\n').encode('utf-8')
+
 def run_nuclei(selected_subdomains):
     """
-    Runs Nuclei on a list of selected subdomains.
-    1. Writes targets to a temp file.
-    2. Runs nuclei -l targets.txt
-    3. Returns the output.
+    Runs Nuclei on a list of selected subdomains and returns the parsed
+    findings as a list of dicts (or a "❌ ..." error string).
+    1. Pipes targets into Nuclei's stdin.
+    2. Spools Nuclei stdout to a temp file.
+    3. mmaps the spool file and parses each JSON line in place.
+
+    Spooling to a file instead of a PIPE means stdout is never held as
+    one giant Python bytes object; the mmap lets orjson parse slices of
+    the file without an intermediate split() copy.
     """
     if not selected_subdomains:
         return "No targets selected."
 
-    # Create temporary targets file
-    with tempfile.NamedTemporaryFile(mode='w+', delete=False, suffix='.txt') as tmp:
-        for sub in selected_subdomains:
-            tmp.write(f"{sub}\n")
-        tmp_path = tmp.name
-
     try:
-        # construct command
-        # Include tags in JSON output
-        cmd = ["nuclei", "-l", tmp_path, "-silent", "-json", "-include-tags"]
-        
         # Check if nuclei is installed
-        if subprocess.call(["which", "nuclei"], stdout=subprocess.DEVNULL) != 0:
-             return "❌ Nuclei binary not found in PATH."
-
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            universal_newlines=True
-        )
-        stdout, stderr = process.communicate()
-        
-        # For this phase, we just return the raw JSON or a summary
-        # In a real app we might stream this too, but for Triage button click, waiting is okay for small batches
-        if process.returncode != 0:
-            return f"❌ Nuclei Error:\n{stderr}"
-        
-        return stdout
+        nuclei_bin = _nuclei_path()
+        if not nuclei_bin:
+            return "❌ Nuclei binary not found in PATH."
+
+        # construct command — targets come from stdin, so no -l flag
+        # Include tags in JSON output
+        cmd = [nuclei_bin, "-silent", "-json", "-include-tags"]
+
+        with tempfile.TemporaryFile() as outf:
+            # close_fds=False skips the walk over /proc/self/fd that
+            # close_fds performs — slow in a Streamlit worker holding many
+            # sockets — and keeps the spawn on the fast posix_spawn path.
+            # Nuclei doesn't touch inherited fds, so the leak is benign.
+            process = subprocess.Popen(
+                cmd,
+                stdin=subprocess.PIPE,
+                stdout=outf,
+                stderr=subprocess.PIPE,
+                close_fds=False,
+                start_new_session=True
+            )
+            _, stderr = process.communicate(input=_targets_blob(selected_subdomains))
+
+            if process.returncode != 0:
+                return f"❌ Nuclei Error:\n{stderr.decode('utf-8', errors='replace')}"
+
+            if outf.seek(0, os.SEEK_END) == 0:
+                return []
+
+            findings = []
+            with mmap.mmap(outf.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for start, end in _iter_newlines(mm):
+                    try:
+                        findings.append(orjson.loads(mm[start:end]))
+                    except orjson.JSONDecodeError:
+                        continue
+            return findings
 
     except Exception as e:
         return f"❌ Execution Error: {str(e)}"
-    finally:
-        # Cleanup
-        if os.path.exists(tmp_path):
-            os.remove(tmp_path)
+
+# Mapping Rules (simplified)
+# OWASP Top 10 categories
+CATEGORIES = {
+    "Injection": ["sqli", "xss", "lfi", "rce", "injection", "ssti", "crlf"],
+    "Broken Access Control": ["auth", "bypass", "idor", "privesc", "access-control"],
+    "Cryptographic Failures": ["ssl", "tls", "crypto", "weak-cipher"],
+    "Security Misconfiguration": ["config", "misconfig", "default-login", "exposure"],
+    "Vulnerable and Outdated Components": ["cve", "outdated", "version"],
+    "Identification and Authentication Failures": ["login", "brute-force", "weak-password"],
+    "SSRF": ["ssrf"],
+    "Information Disclosure": ["exposure", "disclosure", "sensitive", "token", "key"]
+}
+
+# Precomputed per-category matchers, in priority (insertion) order: the
+# exact check is one frozenset hash and the partial check one compiled
+# alternation regex, instead of nested keyword loops per tag.
+_CATEGORY_MATCHERS = [
+    (cat, frozenset(kws), re.compile('|'.join(map(re.escape, kws))))
+    for cat, kws in CATEGORIES.items()
+]
+
+def run_nuclei_stream(selected_subdomains, rate_limit=None):
+    """
+    Runs Nuclei on a list of selected subdomains, yielding each finding
+    (parsed JSON dict) as soon as Nuclei emits it instead of blocking
+    until the whole scan finishes. Raises RuntimeError on setup or scan
+    failure. rate_limit caps requests/sec for this process.
+    """
+    if not selected_subdomains:
+        return
+
+    # Check if nuclei is installed
+    nuclei_bin = _nuclei_path()
+    if not nuclei_bin:
+        raise RuntimeError("Nuclei binary not found in PATH.")
+
+    # Include tags in JSON output; targets come from stdin, so no -l flag
+    cmd = [nuclei_bin, "-silent", "-json", "-include-tags"]
+    if rate_limit:
+        cmd += ["-rate-limit", str(rate_limit)]
+
+    # See run_nuclei: close_fds=False avoids the per-fd close loop and
+    # keeps Popen on the posix_spawn fast path; matters most when the
+    # parallel shards launch several processes at once.
+    process = subprocess.Popen(
+        cmd,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        close_fds=False,
+        start_new_session=True
+    )
+
+    # Drain stderr concurrently: if Nuclei fills the stderr pipe while
+    # we're blocked on stdout, both sides deadlock.
+    stderr_chunks = []
+    stderr_reader = threading.Thread(
+        target=lambda: stderr_chunks.append(process.stderr.read()),
+        daemon=True
+    )
+    stderr_reader.start()
+
+    # If Nuclei dies before draining stdin (bad flag, missing templates)
+    # a large targets blob raises BrokenPipeError here. Swallow it and
+    # fall through to the returncode/stderr check below, which reports
+    # the real failure — same behaviour communicate() gave us.
+    try:
+        process.stdin.write(_targets_blob(selected_subdomains))
+        process.stdin.close()
+    except (BrokenPipeError, OSError):
+        pass
+
+    for line in iter(process.stdout.readline, b''):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield orjson.loads(line)
+        except orjson.JSONDecodeError:
+            continue
+    process.stdout.close()
+    stderr_reader.join()
+    process.wait()
+    if process.returncode != 0:
+        stderr = b''.join(stderr_chunks)
+        raise RuntimeError(f"Nuclei Error:\n{stderr.decode('utf-8', errors='replace')}")
+
+_SHARD_DONE = object()
+
+def run_nuclei_parallel(selected_subdomains, shards=None, rate_limit=None):
+    """
+    Shards the target list across several concurrent Nuclei processes and
+    yields findings from all of them as they arrive, merged into a single
+    stream. Each Nuclei probe is network-bound, so sharding overlaps
+    DNS/TLS latency across processes for near-linear speedup on large
+    target lists. rate_limit (requests/sec) is divided across the shards
+    so total outbound rate matches the single-process case.
+    """
+    if not selected_subdomains:
+        return
+
+    if shards is None:
+        shards = min(os.cpu_count() or 1, len(selected_subdomains) // 50 + 1)
+    if shards <= 1:
+        yield from run_nuclei_stream(selected_subdomains, rate_limit=rate_limit)
+        return
+
+    chunks = [selected_subdomains[i::shards] for i in range(shards)]
+    # Without a cap, K shards each run Nuclei's default internal rate —
+    # K times the intended aggregate. Split the budget evenly.
+    shard_rate = max(1, rate_limit // shards) if rate_limit else None
+    merged = Queue()
+    errors = []
+
+    def _worker(chunk):
+        try:
+            for finding in run_nuclei_stream(chunk, rate_limit=shard_rate):
+                merged.put(finding)
+        except Exception as e:
+            # Catch everything, not just RuntimeError: an OSError (e.g. a
+            # broken stdin pipe) must surface as a failed scan, not as a
+            # clean stream that happened to yield nothing.
+            errors.append(e)
+        finally:
+            merged.put(_SHARD_DONE)
+
+    threads = [threading.Thread(target=_worker, args=(c,), daemon=True) for c in chunks]
+    for t in threads:
+        t.start()
+
+    done = 0
+    while done < len(threads):
+        item = merged.get()
+        if item is _SHARD_DONE:
+            done += 1
+        else:
+            yield item
+
+    if errors:
+        raise errors[0]
+
+@lru_cache(maxsize=2048)
+def _category_for(tags_tuple):
+    # Canonical (sorted, lowered) tag tuples repeat heavily across Nuclei
+    # templates, so most calls resolve from the cache. Sorting is safe
+    # only because resolution is category-first: the winning category is
+    # the same whichever order the tags arrive in.
+    # Categories resolve in priority order: the first category any tag
+    # matches (exactly or partially) wins, same as the original nested
+    # loop.
+    for cat, exact, partial in _CATEGORY_MATCHERS:
+        for tag in tags_tuple:
+            if tag in exact or partial.search(tag):
+                return cat
+
+    # Version-based checks
+    for tag in tags_tuple:
+        if "outdated" in tag or "deprecated" in tag or "cve" in tag:
+            return "Vulnerable and Outdated Components"
+
+    return "Other"
 
 def map_tags_to_category(tags_list):
     """
@@ -73,8 +529,8 @@ def map_tags_to_category(tags_list):
     Output: Category string
     """
     if not tags_list: return "Uncategorized"
-    
-    # Normalize input
+
+    # Normalize input to a hashable canonical key
     if isinstance(tags_list, str):
         tags = [t.strip().lower() for t in tags_list.split(',')]
     elif isinstance(tags_list, list):
@@ -82,37 +538,4 @@ def map_tags_to_category(tags_list):
     else:
         return "Uncategorized"
 
-    # Mapping Rules (simplified)
-    # OWASP Top 10 categories
-    categories = {
-        "Injection": ["sqli", "xss", "lfi", "rce", "injection", "ssti", "crlf"],
-        "Broken Access Control": ["auth", "bypass", "idor", "privesc", "access-control"],
-        "Cryptographic Failures": ["ssl", "tls", "crypto", "weak-cipher"],
-        "Security Misconfiguration": ["config", "misconfig", "default-login", "exposure"],
-        "Vulnerable and Outdated Components": ["cve", "outdated", "version"],
-        "Identification and Authentication Failures": ["login", "brute-force", "weak-password"],
-        "SSRF": ["ssrf"],
-        "Information Disclosure": ["exposure", "disclosure", "sensitive", "token", "key"]
-    }
-
-    for cat, keywords in categories.items():
-        for tag in tags:
-            if tag in keywords:
-                return cat
-            # Partial match check?
-            for k in keywords:
-                if k in tag:
-                    return cat
-    
-    # Version-based checks
-    for tag in tags:
-        if "outdated" in tag or "deprecated" in tag or "cve" in tag:
-            return "Vulnerable and Outdated Components"
-                    
-    return "Other"
-
-def generate_report(vulnerabilities):
-    """
-    Placeholder for more complex logic if needed before template rendering.
-    """
-    pass
+    return _category_for(tuple(sorted(tags)))